@@ -21,6 +21,7 @@ from tqdm import tqdm
 from helpers import TmpFile, one_way_sync, read_json_gz_file, write_json_gz_file, split_chunks
 from platforms.steam import Category, SteamAPI
 from platforms.platforms import PLATFORMS
+from server import serve
 
 SCRIPT_DIR = Path(__file__).parent
 DIST_DIR = SCRIPT_DIR / 'dist'
@@ -30,6 +31,7 @@ CACHE_DIR = SCRIPT_DIR / 'cache'
 RES_DIR = SCRIPT_DIR / 'res'
 STEAM_DB_CACHE = CACHE_DIR / 'steamdb.json.gz'
 REPORT_FILE = DIST_DIR / 'index.html'
+SERVE_REPORT_FILE = DIST_DIR / 'serve.html'
 DATA_DUMP_FILE = DIST_DIR / 'data.json.gz'
 REPO_URL = 'https://git.romlig.ch/gilles/g-export'
 
@@ -151,7 +153,16 @@ def run(*, gog_db, steam_id=None, steam_api_key=None, all_friends=False, friends
     num_games = (df['hide'] == False).sum()
     hidden_games = df['hide'].sum()
     write_json_gz_file(DATA_DUMP_FILE, dict(games=games_dump, friends=friends_dump, platforms=platforms_dump))
-    with TmpFile(REPORT_FILE) as r, r.open('wt', encoding='utf-8') as report:
+    report_args = dict(games=games_dump, friends=friends_dump, platforms=platforms_dump,
+                       show_friends=bool(friends or all_friends), num_games=num_games, hidden_games=hidden_games,
+                       export_time=export_time)
+    write_report(REPORT_FILE, **report_args)
+    write_report(SERVE_REPORT_FILE, server_rows=True, **report_args)
+
+
+def write_report(file: Path, *, games, friends, platforms, show_friends: bool, num_games, hidden_games,
+                 export_time: str, server_rows=False):
+    with TmpFile(file) as r, r.open('wt', encoding='utf-8') as report:
         report.write(
             '<!DOCTYPE html>\n'
             '<html><head>\n'
@@ -162,13 +173,17 @@ def run(*, gog_db, steam_id=None, steam_api_key=None, all_friends=False, friends
             '<script src="res/luxon.min.js"></script>\n'
             '<script>const data = '
         )
-        json.dump(games_dump, report)
+        if server_rows:
+            report.write('null')  # rows are retrieved from the serve mode API
+        else:
+            json.dump(games, report)
         report.write(f';\n')
-        report.write(f'const showFriends = {"true" if friends or all_friends else "false"};\n')
+        report.write(f'const serverRows = {"true" if server_rows else "false"};\n')
+        report.write(f'const showFriends = {"true" if show_friends else "false"};\n')
         report.write(f'const friendsInfo = ')
-        json.dump(friends_dump, report)
+        json.dump(friends, report)
         report.write(';\nconst platformsInfo = ')
-        json.dump(platforms_dump, report)
+        json.dump(platforms, report)
         report.write(';\n')
         report.write(
             '</script>\n'
@@ -343,7 +358,20 @@ if __name__ == '__main__':
                         help='Show games owned by listed friends, Steam ID or vanity URL name or pseudonym')
     parser.add_argument('--gog-db', default=r'C:\ProgramData\GOG.com\Galaxy\storage\galaxy-2.0.db',
                         help='Location of the GOG Galaxy database file galaxy-2.0.db')
+    subparsers = parser.add_subparsers(dest='command', metavar='serve')
+    serve_parser = subparsers.add_parser(
+        'serve', help='Serve an exported game list locally, loading games page by page (for large libraries)',
+        description='Serve the dist folder locally. Games are loaded page by page from the exported data.json.gz.')
+    serve_parser.add_argument('--host', default='127.0.0.1', help='Address to listen on')
+    serve_parser.add_argument('--port', type=int, default=8000, help='Port to listen on')
     arg = parser.parse_args()
+    if arg.command == 'serve':
+        if not DATA_DUMP_FILE.is_file() or not SERVE_REPORT_FILE.is_file():
+            print('Nothing to serve, run the export first', file=stderr)
+            sys.exit(1)
+        serve(DIST_DIR, DATA_DUMP_FILE, '/' + SERVE_REPORT_FILE.name, host=arg.host, port=arg.port)
+        sys.exit(0)
+    del arg.command
     if arg.friends and arg.all_friends:
         print('--friends cannot be used with --all-friends', file=stderr)
         sys.exit(1)
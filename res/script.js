@@ -88,7 +88,7 @@ const formatNum1 = (() => {
 })();
 const yesNo = value => value ? 'yes' : 'no';
 const imageCell = params => params.value ? e('img', {src: params.value, class: 'icon', alt: ''}) : e('div', {class: 'noIcon'});
-const platformsCell = ({value: v}) => e('span', {
+const platformsCell = ({value: v}) => v && e('span', {
         class: 'platforms',
         title: v.split(',').map(p => platformsInfo[p] || p).join('\n')
     }, v.split(',')
@@ -122,10 +122,25 @@ const lastPlayedCell = params => {
                                             `${-Math.round(diff.as('year'))} years ago`
     )
 }
-const ratingCell = ({value: v}) => e('span', {class: 'rating', title: `${v} stars`}, "⭐".repeat(v))
-const friendsCell = ({value: v}) => v.length ? e('span',
+const ratingCell = ({value: v}) => v != null ? e('span', {class: 'rating', title: `${v} stars`}, "⭐".repeat(v)) : null
+const friendsCell = ({value: v}) => v?.length ? e('span',
     {class: 'friends', title: v.map(f => friendsInfo[f].name).join('\n')},
     v.map(f => e('img', {src: friendsInfo[f].icon, alt: friendsInfo[f].name}))) : null;
+const gamesDatasource = {
+    getRows(params) {
+        const query = new URLSearchParams({
+            startRow: params.startRow,
+            endRow: params.endRow,
+            sortModel: JSON.stringify(params.sortModel),
+            filterModel: JSON.stringify(params.filterModel),
+            showHidden: document.querySelector('#showIgnored').checked ? '1' : '0',
+        });
+        fetch(`api/games?${query}`)
+            .then(r => r.ok ? r.json() : Promise.reject(r.statusText))
+            .then(r => params.successCallback(r.rows, r.lastRow))
+            .catch(() => params.failCallback());
+    }
+};
 const gridOptions = {
     columnDefs: [
         {
@@ -191,9 +206,14 @@ const gridOptions = {
         lockVisible: true,
     },
     onCellMouseOver(evt) {
-        showDetails(evt.node.data);
+        if (evt.node.data) showDetails(evt.node.data);
     },
-    rowData: data,
+    ...(serverRows ? {
+        rowModelType: 'infinite',
+        datasource: gamesDatasource,
+        cacheBlockSize: 100,
+        maxBlocksInCache: 10,
+    } : {rowData: data}),
     enableCellTextSelection: true,
     isExternalFilterPresent: () => true,
     doesExternalFilterPass: params => !params.data.hide,
@@ -0,0 +1,271 @@
+import gzip
+import json
+import mimetypes
+import sqlite3
+import threading
+from functools import partial
+from hashlib import sha256
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from helpers import read_json_gz_file
+
+API_GAMES_PATH = '/api/games'
+MAX_PAGE_SIZE = 1000
+CATEGORIES = ['single', 'multi', 'coop', 'pvp']
+COMPRESSIBLE_TYPES = {'application/javascript', 'application/json', 'image/svg+xml', 'text/css', 'text/html',
+                      'text/javascript', 'text/plain'}
+
+# grid column id -> store column, used for sorting and text filters
+SORT_COLUMNS = {
+    'title': 'title COLLATE NOCASE',
+    'platforms': 'platforms',
+    'categories': 'categories',
+    'gameTime': 'game_time',
+    'lastPlayed': 'last_played',
+    'rating': 'rating',
+    'friends': 'friend_count',
+}
+TEXT_FILTER_COLUMNS = {
+    'title': 'title',
+    'platforms': 'platforms',
+    'gameTime': 'game_time',
+    'lastPlayed': 'last_played',
+    'rating': 'rating',
+    'friends': 'friend_names',
+}
+TEXT_FILTERS = {
+    'contains': 'instr(fold({}), ?) > 0',
+    'notContains': 'instr(fold({}), ?) = 0',
+    'equals': 'fold({}) = ?',
+    'notEqual': 'fold({}) != ?',
+    'startsWith': 'substr(fold({}), 1, length(?)) = ?',
+    'endsWith': 'substr(fold({}), -length(?)) = ?',
+}
+
+
+class QueryError(ValueError):
+    pass
+
+
+def fold_text(value):
+    """Same normalization as the client-side text filter: string value, lower case, null is empty."""
+    return '' if value is None else str(value).lower()
+
+
+class GameStore:
+    """Indexed in-memory copy of data.json.gz, queried page by page by the grid's infinite row model."""
+
+    def __init__(self, dump_file: Path):
+        dump = read_json_gz_file(dump_file)
+        friends = dump['friends']
+        self.version = sha256(dump_file.read_bytes()).hexdigest()[:16]
+        self._lock = threading.Lock()
+        self._con = sqlite3.connect(':memory:', check_same_thread=False)
+        self._con.create_function('fold', 1, fold_text, deterministic=True)
+        self._con.execute('''
+CREATE TABLE games (
+pos INTEGER PRIMARY KEY,
+title TEXT,
+platforms TEXT,
+categories INTEGER,
+game_time INTEGER,
+last_played TEXT,
+rating INTEGER,
+friend_names TEXT,
+friend_count INTEGER,
+hide INTEGER,
+row TEXT)''')
+        self._con.executemany('INSERT INTO games VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', (
+            (pos, g['title'], g['platforms'],
+             sum(1 << i for i, c in enumerate(CATEGORIES) if g['categories'][c]) if g['categories'] else None,
+             g['gameTime'], g['lastPlayed'], g['rating'],
+             ','.join(friends[f]['name'] for f in g['friends']), len(g['friends']), g['hide'],
+             json.dumps(g))
+            for pos, g in enumerate(dump['games'])))
+        for column in ['title COLLATE NOCASE', 'platforms', 'categories', 'game_time', 'last_played', 'rating',
+                       'friend_count']:
+            name = column.split()[0]
+            self._con.execute(f'CREATE INDEX games_{name} ON games (hide, {column}, pos)')
+            self._con.execute(f'CREATE INDEX games_all_{name} ON games ({column}, pos)')
+        self._con.execute('ANALYZE')
+        self._counts: Dict[Tuple[str, tuple], int] = {}
+
+    def query(self, start: int, end: int, sort_model: List[dict], filter_model: Dict[str, dict],
+              show_hidden: bool) -> Tuple[List[str], int]:
+        """Return the JSON-encoded rows start..end matching the grid's sort and filter models, and the total count."""
+        if start < 0 or end < start or end - start > MAX_PAGE_SIZE:
+            raise QueryError(f'Invalid row range {start}-{end}')
+        where, params = [] if show_hidden else ['hide = 0'], []
+        for col_id, model in filter_model.items():
+            clause, clause_params = self._filter_clause(col_id, model)
+            where.append(clause)
+            params += clause_params
+        order = []
+        for s in sort_model:
+            if s.get('colId') not in SORT_COLUMNS or s.get('sort') not in ('asc', 'desc'):
+                raise QueryError(f'Invalid sort {s}')
+            order.append(f'{SORT_COLUMNS[s["colId"]]} {s["sort"].upper()}')
+        # same direction as the last sort column, so that single column sorts can walk the (col, pos) indexes
+        order.append('pos DESC' if order and order[-1].endswith('DESC') else 'pos')
+        where = f'WHERE {" AND ".join(where)}' if where else ''
+        with self._lock:
+            count_key = (where, tuple(params))
+            if count_key not in self._counts:
+                self._counts[count_key], = self._con.execute(f'SELECT COUNT(*) FROM games {where}', params).fetchone()
+            rows = self._con.execute(
+                f'SELECT row FROM games {where} ORDER BY {", ".join(order)} LIMIT ? OFFSET ?',
+                [*params, end - start, start]).fetchall()
+        return [r for r, in rows], self._counts[count_key]
+
+    def _filter_clause(self, col_id: str, model) -> Tuple[str, list]:
+        if col_id == 'categories':
+            if model not in CATEGORIES:
+                raise QueryError(f'Invalid category {model}')
+            return 'categories & ? != 0', [1 << CATEGORIES.index(model)]
+        if col_id not in TEXT_FILTER_COLUMNS or not isinstance(model, dict):
+            raise QueryError(f'Invalid filter on {col_id}')
+        if 'operator' in model:
+            clause1, params1 = self._filter_clause(col_id, model['condition1'])
+            clause2, params2 = self._filter_clause(col_id, model['condition2'])
+            operator = 'OR' if model['operator'] == 'OR' else 'AND'
+            return f'({clause1} {operator} {clause2})', params1 + params2
+        if model.get('type') not in TEXT_FILTERS:
+            raise QueryError(f'Invalid filter type {model.get("type")}')
+        if not model.get('filter'):
+            return '1', []
+        clause = TEXT_FILTERS[model['type']].format(TEXT_FILTER_COLUMNS[col_id])
+        return clause, [fold_text(model['filter'])] * clause.count('?')
+
+
+def file_key(path: Path):
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+def gzip_etag(etag: str) -> str:
+    return f'{etag[:-1]}-gz"'
+
+
+class StaticFile:
+    """ETag and, for text resources, gzip-compressed contents of a file, computed once per file version."""
+
+    def __init__(self, path: Path, content_type: str):
+        self.key = file_key(path)
+        mtime_ns, self.size = self.key
+        self.etag = f'"{mtime_ns:x}-{self.size:x}"'
+        self.content_type = content_type
+        self.gzipped = None
+        # files that already have an encoding (e.g. data.json.gz) are sent as they are
+        if content_type in COMPRESSIBLE_TYPES and mimetypes.guess_type(path.name)[1] is None:
+            self.gzipped = gzip.compress(path.read_bytes(), compresslevel=9)
+
+
+class RequestHandler(SimpleHTTPRequestHandler):
+    """Serves the dist folder with ETags and gzip-compressed text resources, as well as the games API."""
+
+    def __init__(self, *args, store: GameStore, index: str, static_files: Dict[Path, StaticFile], **kwargs):
+        self.store = store
+        self.index = index
+        self.static_files = static_files
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self):
+        self.handle_request(head=False)
+
+    def do_HEAD(self):
+        self.handle_request(head=True)
+
+    def handle_request(self, head: bool):
+        url = urlsplit(self.path)
+        if url.path == API_GAMES_PATH:
+            self.send_games(url.query, head)
+            return
+        path = Path(self.translate_path(self.index if url.path == '/' else url.path))
+        if not path.is_file():
+            self.send_error(HTTPStatus.NOT_FOUND, 'File not found')
+            return
+        static = self.static_files.get(path)
+        if static is None or static.key != file_key(path):
+            static = self.static_files[path] = StaticFile(path, self.guess_type(path))
+        gzipped = static.gzipped is not None and self.accepts_gzip()
+        etag = gzip_etag(static.etag) if gzipped else static.etag
+        if self.etag_matches(etag):
+            return
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', static.content_type)
+        self.send_header('Content-Length', str(len(static.gzipped) if gzipped else static.size))
+        self.send_common_headers(etag, gzipped)
+        self.end_headers()
+        if head:
+            return
+        if gzipped:
+            self.wfile.write(static.gzipped)
+        else:
+            with path.open('rb') as f:
+                self.copyfile(f, self.wfile)
+
+    def send_games(self, query: str, head: bool):
+        gzipped = self.accepts_gzip()
+        etag = f'"{self.store.version}-{sha256(query.encode("utf-8")).hexdigest()[:16]}"'
+        if gzipped:
+            etag = gzip_etag(etag)
+        if self.etag_matches(etag):
+            return
+        args = parse_qs(query)
+        try:
+            rows, count = self.store.query(
+                start=int(args.get('startRow', ['0'])[0]),
+                end=int(args.get('endRow', ['100'])[0]),
+                sort_model=json.loads(args.get('sortModel', ['[]'])[0]),
+                filter_model=json.loads(args.get('filterModel', ['{}'])[0]),
+                show_hidden=args.get('showHidden', ['0'])[0] == '1')
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            self.send_error(HTTPStatus.BAD_REQUEST, str(e))
+            return
+        # rows are stored JSON-encoded, no need to decode them again
+        body = f'{{"rows":[{",".join(rows)}],"lastRow":{count}}}'.encode('utf-8')
+        if gzipped:
+            body = gzip.compress(body)
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_common_headers(etag, gzipped)
+        self.end_headers()
+        if not head:
+            self.wfile.write(body)
+
+    def accepts_gzip(self) -> bool:
+        return any(e.split(';')[0].strip() == 'gzip' for e in self.headers.get('Accept-Encoding', '').split(','))
+
+    def etag_matches(self, etag: str) -> bool:
+        """Sends a 304 response and returns true if the client already has the current version."""
+        if etag not in (t.strip() for t in self.headers.get('If-None-Match', '').split(',')):
+            return False
+        self.send_response(HTTPStatus.NOT_MODIFIED)
+        self.send_common_headers(etag, False)
+        self.end_headers()
+        return True
+
+    def send_common_headers(self, etag: str, gzipped: bool):
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Vary', 'Accept-Encoding')
+        if gzipped:
+            self.send_header('Content-Encoding', 'gzip')
+
+
+def serve(dist_dir: Path, dump_file: Path, index: str, host: str, port: int):
+    print("Building games index… ", end="")
+    store = GameStore(dump_file)
+    print("done")
+    handler = partial(RequestHandler, directory=str(dist_dir), store=store, index=index, static_files={})
+    with ThreadingHTTPServer((host, port), handler) as httpd:
+        print(f"Serving {dist_dir} on http://{host}:{port}/ (Ctrl+C to stop)")
+        try:
+            httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass